@@ -1,10 +1,11 @@
+from __future__ import annotations
+
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Optional
-import zipfile
+from typing import TYPE_CHECKING, Optional
 
 import streamlit as st
-import pandas as pd
 
 from localflipper.config import settings
 from localflipper.scraping.craigslist import search_craigslist
@@ -17,12 +18,39 @@ from localflipper.utils.seller_rating import rate_seller
 from localflipper.utils.demand_engine import compute_travel_cost, compute_demand_score
 from localflipper.utils.description_cleaner import clean_seller_text
 from localflipper import db
-from localflipper import google_sheets
+from listing_helpers import format_listing_for_platform, generate_ai_description
+
+# pandas, zipfile and the Google Sheets client are imported where they are
+# used so opening the app (e.g. just the Create Listing tab) stays fast.
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# eBay lookups are network-bound, so a shared thread pool lets a single
+# search price its listings in parallel instead of one at a time.
+# Streamlit re-executes this script on every interaction, so the pool is
+# held in cache_resource to keep one instance alive across reruns.
+@st.cache_resource
+def _ebay_pool() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=32)
+
+
+def normalize_title(title: str) -> str:
+    """Lowercase and collapse whitespace so equivalent titles share a cache key."""
+    return " ".join((title or "").lower().split())
+
+
+# st.cache_data (not lru_cache) so cached prices survive script reruns;
+# entries expire after an hour so prices eventually refresh.
+@st.cache_data(ttl=3600, max_entries=4096, show_spinner=False)
+def _cached_ebay(title_norm: str):
+    return estimate_ebay_sold_price(title_norm)
 
 
 # ---------------------------------------------------------
 # DEAL SEARCH / ARBITRAGE PIPELINE (Craigslist + Facebook)
 # ---------------------------------------------------------
+@st.cache_data(ttl=600, show_spinner=False)
 def run_search(
     cl_site: str,
     query: str,
@@ -42,43 +70,62 @@ def run_search(
     - Facebook Marketplace (optional, via include_facebook)
 
     Returns a single DataFrame sorted by estimated profit.
-    """
 
-    # 1. Craigslist
-    cl_listings = search_craigslist(
-        site=cl_site,
-        query=query,
-        max_price=max_cl_price,
-        postal=postal,
-        distance=distance,
-        max_results=max_cl_results,
-    )
+    Results are cached for 10 minutes per parameter set, so re-renders
+    and repeated clicks with the same inputs skip scraping and pricing.
+    """
+    import pandas as pd
 
-    # 2. Facebook
-    if include_facebook:
-        fb_listings = search_facebook_marketplace(
+    # 1 + 2. Craigslist and Facebook are independent, so scrape them concurrently
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        cl_future = ex.submit(
+            search_craigslist,
+            site=cl_site,
             query=query,
-            location=postal,
-            radius_miles=distance,
+            max_price=max_cl_price,
+            postal=postal,
+            distance=distance,
             max_results=max_cl_results,
         )
-    else:
-        fb_listings = []
-
-    all_deal_candidates = []
+        fb_future = (
+            ex.submit(
+                search_facebook_marketplace,
+                query=query,
+                location=postal,
+                radius_miles=distance,
+                max_results=max_cl_results,
+            )
+            if include_facebook
+            else None
+        )
+        cl_listings = cl_future.result()
+        fb_listings = fb_future.result() if fb_future else []
 
-    def process_listings(listings, source_label: str):
+    # 3. Tag sources and drop reposts / duplicate URLs before pricing
+    unique_listings = []
+    seen_urls: set[tuple[str, str]] = set()
+    for source_label, listings in (("craigslist", cl_listings), ("facebook", fb_listings)):
         for listing in listings:
             # Make sure listing has a source label
             listing.source = source_label
-            ebay_info = estimate_ebay_sold_price(listing.title)
-            deal = compute_deal(listing, ebay_info)
-            if deal:
-                all_deal_candidates.append(deal)
+            key = (source_label, listing.url)
+            if listing.url and key in seen_urls:
+                continue
+            seen_urls.add(key)
+            unique_listings.append(listing)
+
+    # 4. Price each distinct normalized title once, in parallel.
+    # Pool threads have no Streamlit script context, so the cached lookup
+    # logs a "missing ScriptRunContext" warning there; it is harmless.
+    title_norms = [normalize_title(listing.title) for listing in unique_listings]
+    distinct_titles = list(dict.fromkeys(title_norms))
+    ebay_by_title = dict(zip(distinct_titles, _ebay_pool().map(_cached_ebay, distinct_titles)))
 
-    process_listings(cl_listings, "craigslist")
-    if include_facebook:
-        process_listings(fb_listings, "facebook")
+    all_deal_candidates = []
+    for listing, title_norm in zip(unique_listings, title_norms):
+        deal = compute_deal(listing, ebay_by_title[title_norm])
+        if deal:
+            all_deal_candidates.append(deal)
 
     # Existing profit filters (may be 0 / raw mode if no real eBay API yet)
     filtered = filter_deals(
@@ -93,7 +140,24 @@ def run_search(
     # Travel cost is roughly the same per run (radius-based)
     travel_cost = compute_travel_cost(distance, mpg, gas_price)
 
-    rows = []
+    # Build the result column-wise and construct the DataFrame once
+    sources: list[str] = []
+    titles: list[str] = []
+    locations: list = []
+    local_prices: list[float] = []
+    ebay_avg_sold: list = []
+    est_profits: list[float] = []
+    profit_pcts: list[float] = []
+    samples: list = []
+    condition_labels: list = []
+    condition_scores: list = []
+    seller_ratings: list = []
+    est_values: list = []
+    rule_profits: list = []
+    effective_profits: list[float] = []
+    demand_scores: list = []
+    listing_links: list = []
+
     for d in filtered:
         title = d.listing.title or ""
         local_price = float(d.listing.price or 0.0)
@@ -116,39 +180,55 @@ def run_search(
             rule_profit=rule_profit,
         )
 
+        sources.append(d.listing.source)
+        titles.append(title)
+        locations.append(d.listing.location)
+        local_prices.append(local_price)
+        ebay_avg_sold.append(d.ebay.average_sold_price)
+        est_profits.append(round(float(d.estimated_profit or 0.0), 2))
+        profit_pcts.append(round(float(d.profit_margin_pct or 0.0), 1))
+        samples.append(d.ebay.sample_size)
+        condition_labels.append(condition_label)
+        condition_scores.append(condition_score)
+        seller_ratings.append(seller_rating)
+        est_values.append(est_value)
+        rule_profits.append(rule_profit)
         # Effective profit (rule-based) after travel
-        effective_profit = round(rule_profit - travel_cost, 2)
-
-        est_profit = round(float(d.estimated_profit or 0.0), 2)
-        profit_pct = round(float(d.profit_margin_pct or 0.0), 1)
-
-        rows.append(
-            {
-                "Source": d.listing.source,
-                "Title": title,
-                "Location": d.listing.location,
-                "Local Price": local_price,
-                # Existing eBay-based fields (may be 0 in raw mode)
-                "eBay Avg Sold": d.ebay.average_sold_price,
-                "Est Profit (eBay)": est_profit,
-                "Profit % (eBay)": profit_pct,
-                "Samples": d.ebay.sample_size,
-                # New rule-based pricing fields
-                "Condition Guess": condition_label,
-                "Condition Score": condition_score,
-                "Seller Rating": seller_rating,
-                "Rule Market Value": est_value,
-                "Rule Profit Est": rule_profit,
-                "Travel Cost Est": travel_cost,
-                "Effective Profit (Rule)": effective_profit,
-                "Demand Score": demand_score,
-                # Links
-                "Listing Link": d.listing.url,
-                "eBay Search": f"https://www.ebay.com/sch/i.html?_nkw={title.replace(' ', '+')}",
-            }
-        )
-
-    df = pd.DataFrame(rows)
+        effective_profits.append(round(rule_profit - travel_cost, 2))
+        demand_scores.append(demand_score)
+        listing_links.append(d.listing.url)
+
+    df = pd.DataFrame(
+        {
+            "Source": sources,
+            "Title": titles,
+            "Location": locations,
+            "Local Price": local_prices,
+            # Existing eBay-based fields (may be 0 in raw mode)
+            "eBay Avg Sold": ebay_avg_sold,
+            "Est Profit (eBay)": est_profits,
+            "Profit % (eBay)": profit_pcts,
+            "Samples": samples,
+            # New rule-based pricing fields
+            "Condition Guess": condition_labels,
+            "Condition Score": condition_scores,
+            "Seller Rating": seller_ratings,
+            "Rule Market Value": est_values,
+            "Rule Profit Est": rule_profits,
+            "Travel Cost Est": travel_cost,
+            "Effective Profit (Rule)": effective_profits,
+            "Demand Score": demand_scores,
+            # Links
+            "Listing Link": listing_links,
+        }
+    )
+    df["eBay Search"] = "https://www.ebay.com/sch/i.html?_nkw=" + df["Title"].str.replace(
+        " ", "+", regex=False
+    )
+    # Low-cardinality labels as categoricals to save memory
+    df["Source"] = pd.Categorical(df["Source"], categories=["craigslist", "facebook"])
+    df["Condition Guess"] = df["Condition Guess"].astype("category")
+    df["Seller Rating"] = df["Seller Rating"].astype("category")
     # Primary sort by Demand Score, secondary by Effective Profit
     df = df.sort_values(
         by=["Demand Score", "Effective Profit (Rule)"],
@@ -171,165 +251,21 @@ def export_results_to_csv(df: pd.DataFrame, mode: str) -> Path:
 
 
 # ---------------------------------------------------------
-# LISTING COMPOSER HELPERS
+# LISTING FILES
 # ---------------------------------------------------------
-def generate_ai_description(
-    style: str,
-    title: str,
-    price: float,
-    condition: str,
-    category: str,
-    location: str,
-) -> str:
-    title_clean = title.strip() or "This item"
-    price_str = f"${price:,.2f}" if price > 0 else "a fair price"
-    condition_text = condition or "Good"
-    category_text = category.strip() or "General"
-
-    location_line = ""
-    if location.strip():
-        location_line = f"Located in {location.strip()}. "
-
-    if "ps5" in title_clean.lower() or "playstation" in title_clean.lower():
-        base_features = (
-            "Next-gen PlayStation 5 console ideal for 4K gaming, streaming, and Blu-ray. "
-            "Fast SSD load times, smooth performance, and support for the latest titles."
-        )
-    elif "xbox" in title_clean.lower():
-        base_features = (
-            "Powerful Xbox console great for high-frame-rate gaming, Game Pass, and 4K entertainment."
-        )
-    elif any(k in title_clean.lower() for k in ["laptop", "notebook", "macbook"]):
-        base_features = (
-            "Reliable laptop ideal for work, school, and streaming. Ready for productivity or light gaming."
-        )
-    else:
-        base_features = (
-            f"Solid {category_text.lower()} item in {condition_text.lower()} condition. "
-            "Good for everyday use and a sensible pickup at the right price."
-        )
-
-    style = style.lower()
-    if style == "viral hook":
-        lines = [
-            f"STOP SCROLLING — {title_clean} just hit the market and it's in {condition_text.lower()} condition.",
-            "",
-            f"Price: {price_str}. {location_line}First come, first served.",
-            "",
-            base_features,
-            "",
-            "Why you’ll like it:",
-            "- Clean and ready to use",
-            "- Priced to move",
-            "- Great for daily use, gifts, or upgrades",
-            "",
-            "If this post is up, it’s still available. Message me today to claim it.",
-        ]
-    elif style == "professional":
-        lines = [
-            f"{title_clean} — {condition_text} Condition",
-            "",
-            f"Offered at {price_str}. {location_line}",
-            base_features,
-            "",
-            "Details:",
-            f"- Condition: {condition_text}",
-            f"- Category: {category_text}",
-            "- Tested and working as expected (unless otherwise stated).",
-            "",
-            "Local buyers preferred. Serious inquiries only, please.",
-        ]
-    elif style == "quick sell":
-        lines = [
-            f"{title_clean} for sale — {condition_text} condition.",
-            "",
-            f"Price: {price_str}. {location_line}",
-            "Works as it should. Priced to sell quickly.",
-            "",
-            "Pickup only. Cash or simple payment on meetup. First reasonable offer takes it.",
-        ]
-    else:
-        lines = [
-            f"I’m selling my {title_clean.lower()} that’s in {condition_text.lower()} condition.",
-            "",
-            f"I originally picked this up for {category_text.lower()} use, and it has served well. "
-            "Now I’m downsizing and letting it go to someone who’ll actually use it.",
-            "",
-            f"Price is {price_str}. {location_line}",
-            base_features,
-            "",
-            "If you’re local and looking for a good deal, this is a solid pickup. "
-            "Reach out with any questions or to set up a time to check it out.",
-        ]
-
-    return "\n".join(lines)
-
-
-def format_listing_for_platform(
-    platform: str,
-    title: str,
-    price: float,
-    condition: str,
-    category: str,
-    location: str,
-    description: str,
-    local_only: bool,
-) -> str:
-    price_str = f"${price:,.2f}" if price > 0 else "Best offer"
-    base_lines: list[str] = [
-        f"Title: {title}",
-        f"Price: {price_str}",
-        f"Condition: {condition}",
-    ]
-
-    if category.strip():
-        base_lines.append(f"Category: {category.strip()}")
-
-    if location.strip():
-        base_lines.append(f"Location: {location.strip()}")
-
-    base_lines.append("")
-
-    if description.strip():
-        base_lines.append("Description:")
-        base_lines.append(description.strip())
-        base_lines.append("")
-
-    notes: list[str] = []
-
-    if platform.lower() == "facebook":
-        notes.append("Platform: Facebook Marketplace")
-        if local_only:
-            notes.append("Pickup: Local pickup only. No shipping.")
-        else:
-            notes.append("Pickup/Shipping: Local pickup preferred. Shipping may be available.")
-        notes.append("Payments: Cash, Venmo, or as agreed on pickup.")
-    elif platform.lower() == "craigslist":
-        notes.append("Platform: Craigslist")
-        if local_only:
-            notes.append("Terms: Local cash sale only. No shipping.")
-        else:
-            notes.append("Terms: Local sale preferred. Shipping possible if buyer pays in advance.")
-    elif platform.lower() == "offerup":
-        notes.append("Platform: OfferUp")
-        if local_only:
-            notes.append("Pickup: Local meetup in a public place. No shipping.")
-        else:
-            notes.append("Pickup/Shipping: Local meetup or app-enabled shipping.")
-    else:
-        notes.append(f"Platform: {platform}")
-
-    combined = base_lines + [""] + notes
-    return "\n".join(combined)
-
-
 def save_listing_to_files(
     title: str,
     fb_text: str,
     cl_text: str,
     offerup_text: str,
-    uploaded_photos: Optional[list] = None,
+    photos: Optional[list[tuple[str, bytes]]] = None,
 ) -> tuple[Path, Optional[Path]]:
+    """Save platform texts and photos under listings/ and bundle them as a ZIP.
+
+    ``photos`` is a list of ``(original_filename, data)`` pairs.
+    """
+    import zipfile
+
     listings_dir = Path("listings")
     listings_dir.mkdir(exist_ok=True)
 
@@ -343,34 +279,33 @@ def save_listing_to_files(
     folder = listings_dir / base_name
     folder.mkdir(exist_ok=True)
 
-    fb_path = folder / "facebook.txt"
-    cl_path = folder / "craigslist.txt"
-    offerup_path = folder / "offerup.txt"
-
-    fb_path.write_text(fb_text, encoding="utf-8")
-    cl_path.write_text(cl_text, encoding="utf-8")
-    offerup_path.write_text(offerup_text, encoding="utf-8")
+    texts = {
+        "facebook.txt": fb_text,
+        "craigslist.txt": cl_text,
+        "offerup.txt": offerup_text,
+    }
+    for name, text in texts.items():
+        (folder / name).write_text(text, encoding="utf-8")
 
     photos_dir = folder / "photos"
-    photo_paths: list[Path] = []
+    photo_entries: list[tuple[str, bytes]] = []
 
-    if uploaded_photos:
+    if photos:
         photos_dir.mkdir(exist_ok=True)
-        for idx, file in enumerate(uploaded_photos, start=1):
-            ext = Path(file.name).suffix.lower() or ".jpg"
+        for idx, (name, data) in enumerate(photos, start=1):
+            ext = Path(name).suffix.lower() or ".jpg"
             filename = f"img_{idx:02d}{ext}"
-            out_path = photos_dir / filename
-            out_path.write_bytes(file.read())
-            photo_paths.append(out_path)
+            (photos_dir / filename).write_bytes(data)
+            photo_entries.append((filename, data))
 
     zip_path = listings_dir / f"{base_name}.zip"
     try:
-        with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
-            zf.write(fb_path, arcname=fb_path.name)
-            zf.write(cl_path, arcname=cl_path.name)
-            zf.write(offerup_path, arcname=offerup_path.name)
-            for p in photo_paths:
-                zf.write(p, arcname=f"photos/{p.name}")
+        with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED, compresslevel=6) as zf:
+            for name, text in texts.items():
+                zf.writestr(name, text)
+            # JPEG/PNG are already compressed; storing them skips wasted DEFLATE work
+            for filename, data in photo_entries:
+                zf.writestr(f"photos/{filename}", data, compress_type=zipfile.ZIP_STORED)
     except Exception:
         zip_path = None
 
@@ -392,6 +327,8 @@ def main():
         st.session_state["listing_description"] = ""
     if "ai_description_preview" not in st.session_state:
         st.session_state["ai_description_preview"] = ""
+    if "photo_bytes" not in st.session_state:
+        st.session_state["photo_bytes"] = {}
 
     saved_searches = db.get_saved_searches()
 
@@ -534,10 +471,15 @@ def main():
             if not saved_searches:
                 st.warning("No saved searches to run. Add some terms first.")
             else:
-                all_frames = []
-                with st.spinner("Running all saved searches..."):
-                    for term in saved_searches:
-                        df_term = run_search(
+                frames_by_term = {}
+                progress = st.progress(0.0, text="Running all saved searches...")
+                # Worker threads have no Streamlit script context, so the cached
+                # run_search logs a "missing ScriptRunContext" warning per term.
+                # It is expected and harmless; all st.* calls stay on this thread.
+                with ThreadPoolExecutor(max_workers=min(8, len(saved_searches))) as ex:
+                    futures = {
+                        ex.submit(
+                            run_search,
                             cl_site=cl_site,
                             query=term,
                             max_cl_price=max_cl_price,
@@ -549,12 +491,29 @@ def main():
                             include_facebook=include_facebook,
                             mpg=mpg,
                             gas_price=gas_price,
-                        )
+                        ): term
+                        for term in saved_searches
+                    }
+                    for done, future in enumerate(as_completed(futures), start=1):
+                        term = futures[future]
+                        df_term = future.result()
                         if not df_term.empty:
                             df_term.insert(0, "Search Term", term)
-                            all_frames.append(df_term)
+                            frames_by_term[term] = df_term
+                        progress.progress(
+                            done / len(futures),
+                            text=f"Finished '{term}' ({done}/{len(futures)})",
+                        )
+                progress.empty()
+
+                # Keep saved-search order regardless of completion order
+                all_frames = [
+                    frames_by_term[term] for term in saved_searches if term in frames_by_term
+                ]
 
                 if all_frames:
+                    import pandas as pd
+
                     combined = pd.concat(all_frames, ignore_index=True)
                     combined = combined.sort_values(
                         by=["Demand Score", "Effective Profit (Rule)"],
@@ -602,6 +561,8 @@ def main():
 
             if sync_btn:
                 try:
+                    from localflipper import google_sheets
+
                     google_sheets.append_dataframe_to_sheet(results_df, sheet_name)
                     st.success(
                         f"Synced {len(results_df)} rows to Google Sheets tab '{sheet_name}'."
@@ -701,13 +662,27 @@ def main():
             key="listing_photos",
         )
 
+        # Read each upload once per file and reuse the bytes for previews and saving
+        cached_bytes = st.session_state["photo_bytes"]
+        photo_bytes = {
+            file.file_id: cached_bytes[file.file_id]
+            if file.file_id in cached_bytes
+            else file.getvalue()
+            for file in uploaded_photos or []
+        }
+        st.session_state["photo_bytes"] = photo_bytes
+
         if uploaded_photos:
             st.write(f"{len(uploaded_photos)} photo(s) selected:")
             preview_cols = st.columns(min(3, len(uploaded_photos)))
             for idx, file in enumerate(uploaded_photos):
                 col = preview_cols[idx % len(preview_cols)]
                 with col:
-                    st.image(file, caption=file.name, use_container_width=True)
+                    st.image(
+                        photo_bytes[file.file_id],
+                        caption=file.name,
+                        use_container_width=True,
+                    )
 
         generate_btn = st.button("Generate Platform Text", key="btn_generate_listing")
 
@@ -806,7 +781,10 @@ def main():
                             fb_text=fb_text,
                             cl_text=cl_text,
                             offerup_text=offerup_text,
-                            uploaded_photos=uploaded_photos,
+                            photos=[
+                                (file.name, photo_bytes[file.file_id])
+                                for file in uploaded_photos or []
+                            ],
                         )
                         st.success(f"Saved listing files to: {folder}")
 
@@ -0,0 +1,217 @@
+# ---------------------------------------------------------
+# LISTING COMPOSER HELPERS
+#
+# Pure string builders with no Streamlit or I/O dependencies, kept in their
+# own module so it can optionally be compiled with mypyc:
+#   mypyc listing_helpers.py
+# ---------------------------------------------------------
+
+# Keyword -> feature blurb, checked in order; first match wins
+_FEATURE_TABLE: tuple[tuple[frozenset[str], str], ...] = (
+    (
+        frozenset({"ps5", "playstation"}),
+        "Next-gen PlayStation 5 console ideal for 4K gaming, streaming, and Blu-ray. "
+        "Fast SSD load times, smooth performance, and support for the latest titles.",
+    ),
+    (
+        frozenset({"xbox"}),
+        "Powerful Xbox console great for high-frame-rate gaming, Game Pass, and 4K entertainment.",
+    ),
+    (
+        frozenset({"laptop", "notebook", "macbook"}),
+        "Reliable laptop ideal for work, school, and streaming. Ready for productivity or light gaming.",
+    ),
+)
+
+
+def _viral_hook_lines(
+    title_clean: str,
+    price_str: str,
+    condition_text: str,
+    category_text: str,
+    location_line: str,
+    base_features: str,
+) -> list[str]:
+    return [
+        f"STOP SCROLLING — {title_clean} just hit the market and it's in {condition_text.lower()} condition.",
+        "",
+        f"Price: {price_str}. {location_line}First come, first served.",
+        "",
+        base_features,
+        "",
+        "Why you’ll like it:",
+        "- Clean and ready to use",
+        "- Priced to move",
+        "- Great for daily use, gifts, or upgrades",
+        "",
+        "If this post is up, it’s still available. Message me today to claim it.",
+    ]
+
+
+def _professional_lines(
+    title_clean: str,
+    price_str: str,
+    condition_text: str,
+    category_text: str,
+    location_line: str,
+    base_features: str,
+) -> list[str]:
+    return [
+        f"{title_clean} — {condition_text} Condition",
+        "",
+        f"Offered at {price_str}. {location_line}",
+        base_features,
+        "",
+        "Details:",
+        f"- Condition: {condition_text}",
+        f"- Category: {category_text}",
+        "- Tested and working as expected (unless otherwise stated).",
+        "",
+        "Local buyers preferred. Serious inquiries only, please.",
+    ]
+
+
+def _quick_sell_lines(
+    title_clean: str,
+    price_str: str,
+    condition_text: str,
+    category_text: str,
+    location_line: str,
+    base_features: str,
+) -> list[str]:
+    return [
+        f"{title_clean} for sale — {condition_text} condition.",
+        "",
+        f"Price: {price_str}. {location_line}",
+        "Works as it should. Priced to sell quickly.",
+        "",
+        "Pickup only. Cash or simple payment on meetup. First reasonable offer takes it.",
+    ]
+
+
+def _story_lines(
+    title_clean: str,
+    price_str: str,
+    condition_text: str,
+    category_text: str,
+    location_line: str,
+    base_features: str,
+) -> list[str]:
+    return [
+        f"I’m selling my {title_clean.lower()} that’s in {condition_text.lower()} condition.",
+        "",
+        f"I originally picked this up for {category_text.lower()} use, and it has served well. "
+        "Now I’m downsizing and letting it go to someone who’ll actually use it.",
+        "",
+        f"Price is {price_str}. {location_line}",
+        base_features,
+        "",
+        "If you’re local and looking for a good deal, this is a solid pickup. "
+        "Reach out with any questions or to set up a time to check it out.",
+    ]
+
+
+# Unknown styles (including "story") fall back to the story template
+_STYLE_BUILDERS = {
+    "viral hook": _viral_hook_lines,
+    "professional": _professional_lines,
+    "quick sell": _quick_sell_lines,
+}
+
+
+def generate_ai_description(
+    style: str,
+    title: str,
+    price: float,
+    condition: str,
+    category: str,
+    location: str,
+) -> str:
+    title_clean = title.strip() or "This item"
+    title_lower = title_clean.lower()
+    price_str = f"${price:,.2f}" if price > 0 else "a fair price"
+    condition_text = condition or "Good"
+    category_text = category.strip() or "General"
+
+    location_line = ""
+    if location.strip():
+        location_line = f"Located in {location.strip()}. "
+
+    base_features = next(
+        (
+            text
+            for keywords, text in _FEATURE_TABLE
+            if any(k in title_lower for k in keywords)
+        ),
+        f"Solid {category_text.lower()} item in {condition_text.lower()} condition. "
+        "Good for everyday use and a sensible pickup at the right price.",
+    )
+
+    builder = _STYLE_BUILDERS.get(style.lower(), _story_lines)
+    lines = builder(
+        title_clean,
+        price_str,
+        condition_text,
+        category_text,
+        location_line,
+        base_features,
+    )
+    return "\n".join(lines)
+
+
+def format_listing_for_platform(
+    platform: str,
+    title: str,
+    price: float,
+    condition: str,
+    category: str,
+    location: str,
+    description: str,
+    local_only: bool,
+) -> str:
+    price_str = f"${price:,.2f}" if price > 0 else "Best offer"
+    base_lines: list[str] = [
+        f"Title: {title}",
+        f"Price: {price_str}",
+        f"Condition: {condition}",
+    ]
+
+    if category.strip():
+        base_lines.append(f"Category: {category.strip()}")
+
+    if location.strip():
+        base_lines.append(f"Location: {location.strip()}")
+
+    base_lines.append("")
+
+    if description.strip():
+        base_lines.append("Description:")
+        base_lines.append(description.strip())
+        base_lines.append("")
+
+    notes: list[str] = []
+
+    if platform.lower() == "facebook":
+        notes.append("Platform: Facebook Marketplace")
+        if local_only:
+            notes.append("Pickup: Local pickup only. No shipping.")
+        else:
+            notes.append("Pickup/Shipping: Local pickup preferred. Shipping may be available.")
+        notes.append("Payments: Cash, Venmo, or as agreed on pickup.")
+    elif platform.lower() == "craigslist":
+        notes.append("Platform: Craigslist")
+        if local_only:
+            notes.append("Terms: Local cash sale only. No shipping.")
+        else:
+            notes.append("Terms: Local sale preferred. Shipping possible if buyer pays in advance.")
+    elif platform.lower() == "offerup":
+        notes.append("Platform: OfferUp")
+        if local_only:
+            notes.append("Pickup: Local meetup in a public place. No shipping.")
+        else:
+            notes.append("Pickup/Shipping: Local meetup or app-enabled shipping.")
+    else:
+        notes.append(f"Platform: {platform}")
+
+    combined = base_lines + [""] + notes
+    return "\n".join(combined)